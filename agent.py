@@ -1,14 +1,28 @@
 import os
+import sys
 import uuid
 import asyncio
+import weakref
 from typing import Any
 from dotenv import load_dotenv
 
-from prompts import calendar_agent_prompt
-from tools import create_event, change_event, cancel_event, list_event
+from prompts import CALENDAR_PROMPT_STATIC, current_date_prompt
+from tools import create_event, create_events, change_event, change_events, cancel_event, cancel_events, list_event
 
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from pydantic_ai import Agent
-from pydantic_ai.messages import ToolCallPart
+from pydantic_ai.models.openai import OpenAIChatModel
+from pydantic_ai.providers.openai import OpenAIProvider
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
 from supabase import create_client, Client
 
 load_dotenv()
@@ -17,55 +31,251 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+VERBOSE = "--verbose" in sys.argv
+
 # Generate a single chat_id for the entire session
 SESSION_CHAT_ID = str(uuid.uuid4())
 chat_history: Any | None = None 
     
-def insert_to_db(user_input: str, agent_output: str):
+# Chat logs are queued and written to Supabase in bulk by a background task so the
+# blocking supabase-py call stays off the request path
+CHAT_LOG_BATCH_SIZE = 50
+CHAT_LOG_MAX_WAIT_S = 0.05
+
+# Both are created by start_chat_log_flusher on the running loop, since a queue is bound to one loop
+_chat_log_queue: asyncio.Queue | None = None
+_flush_task: asyncio.Task | None = None
+
+def _write_rows(rows: list[dict]):
+    try:
+        supabase.table("chats").insert(rows).execute()
+        return
+    except Exception as e:
+        if len(rows) == 1:
+            print(f"Error inserting to Supabase: {e}")
+            return
+    # A bulk insert is all-or-nothing, so retry row by row to keep one bad row from dropping the rest
+    for row in rows:
+        try:
+            supabase.table("chats").insert(row).execute()
+        except Exception as e:
+            print(f"Error inserting to Supabase (chat_id={row['chat_id']}): {e}")
+
+async def insert_to_db(user_input: str, agent_output: str, chat_id: str = SESSION_CHAT_ID):
+    row = {
+        "chat_id": chat_id, 
+        "message": user_input, 
+        "response": agent_output
+    }
+    if _flush_task is None or _flush_task.done():
+        # The flusher isn't running (not started yet, already stopped, or died), so write straight
+        # through on a worker thread
+        await asyncio.to_thread(_write_rows, [row])
+    else:
+        _chat_log_queue.put_nowait(row)
+
+# Conversation history lives in Supabase keyed by session id, so any worker or
+# instance can pick up a session
+SESSIONS_TABLE = "chat_sessions"
+
+def _fetch_history(session_id: str) -> list[ModelMessage] | None:
+    # Returns None only when the session has no stored row. Supabase errors propagate, since
+    # carrying on with an empty history would overwrite the stored one on save
+    rows = supabase.table(SESSIONS_TABLE).select("history").eq("session_id", session_id).limit(1).execute().data
+    if not rows:
+        return None
+    return ModelMessagesTypeAdapter.validate_python(rows[0]["history"])
+
+def _store_history(session_id: str, messages: list[ModelMessage]):
     try:
-        supabase.table("chats").insert({
-            "chat_id": SESSION_CHAT_ID, 
-            "message": user_input, 
-            "response": agent_output
+        supabase.table(SESSIONS_TABLE).upsert({
+            "session_id": session_id,
+            "history": ModelMessagesTypeAdapter.dump_python(messages, mode="json"),
         }).execute()
     except Exception as e:
-        print(f"Error inserting to Supabase: {e}")
+        print(f"Error saving session to Supabase: {e}")
+
+async def load_history(session_id: str) -> list[ModelMessage] | None:
+    return await asyncio.to_thread(_fetch_history, session_id)
+
+async def save_history(session_id: str, messages: list[ModelMessage]):
+    await asyncio.to_thread(_store_history, session_id, messages)
+
+async def _flush_loop():
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _chat_log_queue.get()]
+        deadline = loop.time() + CHAT_LOG_MAX_WAIT_S
+        try:
+            while len(batch) < CHAT_LOG_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(_chat_log_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        finally:
+            await loop.run_in_executor(None, _write_rows, batch)
+
+def start_chat_log_flusher():
+    global _chat_log_queue, _flush_task
+    if _flush_task is None:
+        _chat_log_queue = asyncio.Queue()
+        _flush_task = asyncio.create_task(_flush_loop())
+
+async def stop_chat_log_flusher():
+    global _flush_task
+    if _flush_task is None:
+        return
+    _flush_task.cancel()
+    try:
+        await _flush_task
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        print(f"Chat log flusher had stopped with an error: {e}")
+    _flush_task = None
+
+    # Write out anything still queued at shutdown
+    remaining = []
+    while not _chat_log_queue.empty():
+        remaining.append(_chat_log_queue.get_nowait())
+    if remaining:
+        await asyncio.to_thread(_write_rows, remaining)
 
 
+# One OpenAI client shared by every agent run in the process. It uses the OpenAI SDK's
+# large connection pool over HTTP/2, so concurrent requests multiplex over warm
+# connections instead of queueing for a small default pool
+openai_client = AsyncOpenAI(http_client=DefaultAsyncHttpxClient(http2=True))
+openai_model = OpenAIChatModel('gpt-4o', provider=OpenAIProvider(openai_client=openai_client))
+
 # Initialize Agent
+# The static prompt goes first so its prefix stays identical across runs and can hit
+# OpenAI's prompt cache; the date line is added per run by _today below.
 calendar_agent = Agent(
-    'openai:gpt-4o',
-    system_prompt=calendar_agent_prompt,
-    tools=[create_event, change_event, cancel_event, list_event]
+    openai_model,
+    system_prompt=CALENDAR_PROMPT_STATIC,
+    tools=[create_event, create_events, change_event, change_events, cancel_event, cancel_events, list_event]
     )
 
+@calendar_agent.system_prompt(dynamic=True)
+async def _today() -> str:
+    # Re-evaluated every run (even with message history) so long-lived processes don't go stale after midnight
+    return current_date_prompt()
+
+# History trimming: once the estimated history size passes HISTORY_TRIM_RATIO of the
+# budget, older turns are folded into a short summary and only the recent tail is kept
+HISTORY_TOKEN_BUDGET = 8000
+HISTORY_TRIM_RATIO = 0.8
+HISTORY_KEEP_RECENT = 6
+HISTORY_SUMMARY_PREFIX = "Summary of earlier conversation:"
+HISTORY_SUMMARY_MAX_LINES = 40
+
+def _part_text(part: Any) -> str:
+    if isinstance(part, ToolCallPart):
+        return f"{part.tool_name}({part.args_as_json_str()})"
+    return str(getattr(part, "content", ""))
+
+# In the CLI, messages carried over in the history are the same objects every turn, so their
+# estimates are cached by identity; the weakref drops the entry once a message is gone.
+# Only the CLI benefits: the API rebuilds the history from Supabase on every request, so each
+# message there is a fresh object and the cache never hits across turns.
+_token_cache: dict[int, tuple[weakref.ref, int]] = {}
+
+def _estimate_tokens(message: ModelMessage) -> int:
+    key = id(message)
+    cached = _token_cache.get(key)
+    if cached is not None and cached[0]() is message:
+        return cached[1]
+    # ~4 characters per token is close enough to decide when to trim
+    count = sum(len(_part_text(part)) for part in message.parts) // 4
+    _token_cache[key] = (weakref.ref(message, lambda _, key=key: _token_cache.pop(key, None)), count)
+    return count
+
+def _is_user_turn(message: ModelMessage) -> bool:
+    return isinstance(message, ModelRequest) and any(isinstance(p, UserPromptPart) for p in message.parts)
+
+def _summarize(messages: list[ModelMessage]) -> list[str]:
+    # Keep what the user asked for and what the tools did, drop the model's prose
+    lines = []
+    for message in messages:
+        for part in message.parts:
+            if isinstance(part, UserPromptPart):
+                lines.append(f"- User: {_part_text(part)[:200]}")
+            elif isinstance(part, ToolCallPart):
+                lines.append(f"- Called {_part_text(part)[:200]}")
+            elif isinstance(part, ToolReturnPart):
+                lines.append(f"  -> {_part_text(part)[:200]}")
+    return lines
+
+def trim_history(messages: list[ModelMessage]) -> list[ModelMessage]:
+    """Fold older turns into a summary once the history grows past the token budget."""
+    if sum(_estimate_tokens(m) for m in messages) <= HISTORY_TRIM_RATIO * HISTORY_TOKEN_BUDGET:
+        return messages
+
+    # Cut at the start of a user turn so tool calls stay next to their returns
+    cut = len(messages) - HISTORY_KEEP_RECENT
+    while cut > 1 and not _is_user_turn(messages[cut]):
+        cut -= 1
+    if cut <= 1:
+        return messages
+
+    # The first request carries the system prompts (and any previous summary)
+    system_parts = [p for p in messages[0].parts if isinstance(p, SystemPromptPart)]
+    summary_lines = []
+    for part in system_parts:
+        if part.content.startswith(HISTORY_SUMMARY_PREFIX):
+            summary_lines = part.content.splitlines()[1:]
+    system_parts = [p for p in system_parts if not p.content.startswith(HISTORY_SUMMARY_PREFIX)]
+
+    summary_lines += _summarize([ModelRequest(parts=[p for p in messages[0].parts if not isinstance(p, SystemPromptPart)])])
+    summary_lines += _summarize(messages[1:cut])
+    summary = "\n".join([HISTORY_SUMMARY_PREFIX, *summary_lines[-HISTORY_SUMMARY_MAX_LINES:]])
+
+    head = ModelRequest(parts=[*system_parts, SystemPromptPart(content=summary)])
+    return [head, *messages[cut:]]
+
 async def process_chat(user_input: str, current_history = Any | None) -> Any | None:
     global chat_history
     agent_output = await calendar_agent.run(user_input, message_history=current_history)
-    insert_to_db(user_input, agent_output.output)
-    chat_history = agent_output.all_messages()
+    await insert_to_db(user_input, agent_output.output)
+    chat_history = trim_history(agent_output.all_messages())
     
     # Print the agent's response
     print(agent_output.output)
     
-    # Print the tool calls that were made
-    tool_calls_made = False
-    for message in agent_output.new_messages():
-        for part in message.parts:
-            if isinstance(part, ToolCallPart):
-                if not tool_calls_made:
-                    print("\nTool calls made:")
-                    tool_calls_made = True
-                print(f"  Tool: {part.tool_name}, Args: {part.args}")
-    if not tool_calls_made:
-        print("\nNo tool calls were made.")
+    # Print the tool calls that were made (only with --verbose)
+    if VERBOSE:
+        tool_calls_made = False
+        for message in agent_output.new_messages():
+            if not isinstance(message, ModelResponse):
+                continue
+            for part in message.parts:
+                if isinstance(part, ToolCallPart):
+                    if not tool_calls_made:
+                        print("\nTool calls made:")
+                        tool_calls_made = True
+                    print(f"  Tool: {part.tool_name}, Args: {part.args}")
+        if not tool_calls_made:
+            print("\nNo tool calls were made.")
     
     return chat_history
 
+async def _start_cli_flusher():
+    start_chat_log_flusher()
+
 if __name__ == '__main__':
     print(f"Starting new chat session. Session ID: {SESSION_CHAT_ID}")
     print("How can I help you with your scheduling?")
     
-    while True:
-        user_input = input("-> ")
-        asyncio.run(process_chat(user_input, chat_history))
\ No newline at end of file
+    # One long-lived event loop so HTTP connections to OpenAI/Supabase are reused between turns.
+    # input() stays on the main thread so Ctrl-C at the prompt exits immediately.
+    with asyncio.Runner() as runner:
+        runner.run(_start_cli_flusher())
+        try:
+            while True:
+                chat_history = runner.run(process_chat(input("-> "), chat_history))
+        finally:
+            runner.run(stop_chat_log_flusher())
\ No newline at end of file
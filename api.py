@@ -1,24 +1,44 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional, Any
+import os
+import uuid
+from contextlib import asynccontextmanager
+from typing import Optional
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, ValidationError
-
-from agent import calendar_agent, insert_to_db, SESSION_CHAT_ID 
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel
+
+from agent import (
+    calendar_agent,
+    insert_to_db,
+    load_history,
+    save_history,
+    trim_history,
+    start_chat_log_flusher,
+    stop_chat_log_flusher,
+)
 
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     handlers=[logging.StreamHandler()] 
 )
 logger = logging.getLogger(__name__)
 
-chat_history: Any | None = None
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Chat logs are flushed in the background for the lifetime of the app
+    start_chat_log_flusher()
+    try:
+        yield
+    finally:
+        await stop_chat_log_flusher()
+
 
-app = FastAPI(title="Google Calendar Voice Agent API", version="1.0.0")
+app = FastAPI(title="Google Calendar Voice Agent API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +46,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=512)
 
 
 class ChatRequest(BaseModel):
@@ -41,73 +62,64 @@ class ChatResponse(BaseModel):
 @app.get("/")
 async def healthcheck() -> dict[str, str]:
     """Simple liveness probe."""
-    logger.info("Healthcheck endpoint was called.")
+    logger.debug("Healthcheck endpoint was called.")
     return {"status": "ok"}
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: Request) -> ChatResponse: 
+async def chat_endpoint(payload: ChatRequest) -> ChatResponse: 
     """Main entry-point used by Vapi workflows.
 
     Receives a transcript, forwards it to the calendar agent, and returns the
-    agent's textual response. This version includes extensive logging.
+    agent's textual response. Per-step logging is at DEBUG; set LOG_LEVEL=DEBUG to see it.
     """
-    logger.info("--- /chat endpoint hit ---")
-    global chat_history  
-
-    raw_body = await request.body()
-    logger.info(f"Received raw request body: {raw_body.decode()}")
-
-    try:
-        payload = ChatRequest.parse_raw(raw_body)
-        logger.info(f"Successfully parsed request payload: message='{payload.message}', session_id='{payload.session_id}'")
-    except ValidationError as e:
-        logger.error(f"Pydantic validation failed for payload: {raw_body.decode()}. Error: {e}")
-        raise HTTPException(status_code=422, detail=f"Invalid payload format: {e}")
+    logger.debug("--- /chat endpoint hit ---")
+    logger.debug("Received payload: message=%r, session_id=%r", payload.message, payload.session_id)
 
     try:
-        # If the caller supplies a *different* session id, start a fresh history
-        if payload.session_id and payload.session_id != SESSION_CHAT_ID:
-            logger.info(f"New session ID '{payload.session_id}' received. Resetting chat history.")
-            chat_history = None
-        else:
-            logger.info(f"Continuing with session ID '{SESSION_CHAT_ID}'. Chat history is {'present' if chat_history else 'empty'}.")
+        # History is stored per session, so no state is kept in this process
+        session_id = payload.session_id or str(uuid.uuid4())
+        chat_history = await load_history(session_id)
+        logger.debug("Session %r. Chat history is %s.", session_id, "present" if chat_history else "empty")
 
         # Forward the transcript to the agent (returns ToolCall-aware output)
-        logger.info(f"Running agent with message: '{payload.message}'")
         agent_output = await calendar_agent.run(
             payload.message, message_history=chat_history
         )
-        logger.info(f"Agent returned output: '{agent_output.output}'")
-        if hasattr(agent_output, 'tool_calls') and agent_output.tool_calls:
-            logger.info(f"Agent made tool calls: {agent_output.tool_calls}")
+        logger.debug("Agent returned output: %r", agent_output.output)
 
-        logger.info("Inserting interaction to database...")
-        insert_to_db(payload.message, agent_output.output)
-        logger.info("...insertion to database complete.")
+        await insert_to_db(payload.message, agent_output.output, chat_id=session_id)
 
-        chat_history = agent_output.all_messages()
-        logger.info("Chat history updated for subsequent requests.")
+        chat_history = trim_history(agent_output.all_messages())
+        await save_history(session_id, chat_history)
 
-        response_data = ChatResponse(session_id=SESSION_CHAT_ID, response=agent_output.output)
-        logger.info(f"Sending response: {response_data.json()}")
-        logger.info("--- /chat endpoint finished ---")
+        response_data = ChatResponse(session_id=session_id, response=agent_output.output)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sending response: %s", response_data.model_dump_json())
+        logger.info(
+            "/chat session_id=%s message_chars=%d response_chars=%d history_messages=%d",
+            session_id, len(payload.message), len(agent_output.output), len(chat_history),
+        )
         return response_data
 
     except HTTPException as http_exc:
-        logger.error(f"Caught HTTPException: {http_exc.status_code} - {http_exc.detail}", exc_info=True)
+        logger.error("Caught HTTPException: %s - %s", http_exc.status_code, http_exc.detail, exc_info=True)
         raise http_exc
     except Exception as exc: 
-        logger.error(f"An unexpected error occurred in /chat endpoint: {str(exc)}", exc_info=True)
+        logger.error("An unexpected error occurred in /chat endpoint: %s", exc, exc_info=True)
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 if __name__ == "__main__":
     import uvicorn
+    # One worker per core; uvicorn picks uvloop/httptools when installed. Set RELOAD=1 for a
+    # single auto-reloading dev worker
+    reload = os.getenv("RELOAD") == "1"
     uvicorn.run(
         "api:app",
         host="0.0.0.0",
         port=8001,
-        reload=True
+        reload=reload,
+        workers=1 if reload else int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
     )
 
 # Run: cloudflared tunnel run <TUNNEL_ID>
\ No newline at end of file
@@ -1,10 +1,27 @@
 import os 
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.model import JsonModel
+import orjson
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 
-def create_service(client_secret_file, api_name, api_version, *scopes, prefix=''):
+class OrjsonModel(JsonModel):
+    """JsonModel that decodes API responses with orjson instead of the stdlib json module."""
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return content.decode("utf-8") if isinstance(content, bytes) else content
+        if self._data_wrapper and isinstance(body, dict) and "data" in body:
+            body = body["data"]
+        return body
+
+
+def create_service(client_secret_file, api_name, api_version, *scopes, prefix='', timeout=None):
     CLIENT_SECRET_FILE = client_secret_file
     API_SERVICE_NAME = api_name
     API_VERSION = api_version
@@ -32,7 +49,10 @@ def create_service(client_secret_file, api_name, api_version, *scopes, prefix=''
             token.write(creds.to_json())
     
     try: 
-        service = build(API_SERVICE_NAME, API_VERSION, credentials=creds, static_discovery=False)
+        # Keep-alive httplib2 client; reused for every request made through this service
+        http = AuthorizedHttp(creds, http=httplib2.Http(timeout=timeout))
+        # Use the discovery document bundled with googleapiclient instead of fetching it on every build
+        service = build(API_SERVICE_NAME, API_VERSION, http=http, model=OrjsonModel(), static_discovery=True)
         print(f'{API_SERVICE_NAME}, {API_VERSION} service created successfully')
         return service
     except Exception as e:
@@ -1,20 +1,137 @@
 import os
+import re
+import logging
+import functools
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta, time
 
-from google_apis import create_service
 from googleapiclient.errors import HttpError
+from google.auth.exceptions import RefreshError
+import ciso8601
 import dateutil.parser
 from dateutil.tz import gettz
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Skip reading .env when the environment already provides the setting (e.g. containers, CI)
+if not os.getenv("GOOGLE_CLIENT_SECRET_FILE"):
+    load_dotenv()
 
 GOOGLE_CLIENT_SECRET_PATH = os.getenv("GOOGLE_CLIENT_SECRET_FILE", "client_secret.json")
 CALENDAR_API_NAME = 'calendar'
 CALENDAR_API_VERSION = 'v3'
 CALENDAR_SCOPES = ['https://www.googleapis.com/auth/calendar'] 
+CALENDAR_HTTP_TIMEOUT = 10
+
+# The process-local timezone, resolved once instead of on every parse
+_LOCAL_TZ = gettz()
+_TZINFOS = {"local": _LOCAL_TZ}
+
+# Shared dateutil parser; it only holds its parserinfo tables, so it is safe to reuse across threads
+_DATEUTIL_PARSER = dateutil.parser.parser()
+
+# Built Calendar services are reused across tool calls. They are cached per thread because the
+# agent runs sync tools in a thread pool and the underlying httplib2 client is not thread-safe.
+_service_cache = threading.local()
+
+def _get_calendar_service():
+    """
+    Returns this thread's (service, events resource) pair, building it on first use.
+    Both are None if the service could not be created.
+    """
+    service = getattr(_service_cache, "service", None)
+    if service is None:
+        # Deferred: google_apis pulls in googleapiclient.discovery and the auth stack, which
+        # dominates import time and is only needed once a tool actually talks to Calendar
+        from google_apis import create_service
+        service = create_service(GOOGLE_CLIENT_SECRET_PATH, CALENDAR_API_NAME, CALENDAR_API_VERSION, CALENDAR_SCOPES, timeout=CALENDAR_HTTP_TIMEOUT)
+        if service is None:
+            return None, None
+        _service_cache.service = service
+        _service_cache.events = service.events()
+    return service, _service_cache.events
+
+# Google Calendar accepts at most 50 calls per batch request
+CALENDAR_BATCH_LIMIT = 50
+
+def _execute_batch(service, requests: list) -> list:
+    """
+    Executes Calendar API requests in as few batch HTTP requests as possible.
+    Returns a (response, exception) pair per request, in the same order as requests.
+    """
+    results: list = [(None, None)] * len(requests)
+
+    def _callback(request_id, response, exception):
+        results[int(request_id)] = (response, exception)
+
+    for offset in range(0, len(requests), CALENDAR_BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=_callback)
+        for i, request in enumerate(requests[offset:offset + CALENDAR_BATCH_LIMIT], start=offset):
+            batch.add(request, request_id=str(i))
+        batch.execute()
+    return results
+
+def _invalidate_calendar_service():
+    _service_cache.service = None
+    _service_cache.events = None
+
+def _api_error_message(error: Exception, action: str) -> str:
+    """
+    Formats an API error for the agent. AuthorizedHttp already refreshes and retries once on a 401,
+    so a RefreshError (e.g. a revoked or expired refresh token) or a 401 that still gets through
+    means the cached service's credentials are unusable. The service is then dropped and rebuilt
+    (re-authenticating if needed) on the next call.
+    """
+    if isinstance(error, RefreshError):
+        _invalidate_calendar_service()
+        return f"Google Calendar authentication failed while {action}: {str(error)}. Please re-authenticate."
+    if isinstance(error, HttpError):
+        if error.resp.status == 401:
+            _invalidate_calendar_service()
+        return f"Google Calendar API error while {action}: {error.resp.reason}. Details: {error.content.decode()}"
+    return f"An unexpected error occurred while {action}: {str(error)}"
+
+# Relative date strings as (day offset from today, time of day); "now" has no offset and uses the current time
+_RELATIVE_DATES = {
+    "now": (None, None),
+    "today": (0, time.min),
+    "start of today": (0, time.min),
+    "beginning of today": (0, time.min),
+    "end of today": (0, time.max),
+    "tonight": (0, time.max), # Assumes 'tonight' means end of current day for API calls
+    "tomorrow": (1, time.min),
+    "start of tomorrow": (1, time.min),
+    "beginning of tomorrow": (1, time.min),
+    "end of tomorrow": (1, time.max),
+    "yesterday": (-1, time.min),
+    "start of yesterday": (-1, time.min),
+    "beginning of yesterday": (-1, time.min),
+    "end of yesterday": (-1, time.max),
+}
+
+# Strict ISO 8601 shapes routed to ciso8601; anything else goes straight to dateutil
+# (hours 00-23 only: ciso8601 accepts T24:00 and rolls it over, where dateutil rejects it)
+_ISO_RE = re.compile(r'\d{4}-\d{2}-\d{2}([T ]([01]\d|2[0-3]):\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?)?')
+
+# Fully-qualified ISO 8601 with an explicit offset, i.e. exactly what isoformat() would give back
+# (hours 00-23 only: ciso8601 would accept and roll over T24:00:00)
+_FULL_ISO_RE = re.compile(r'\d{4}-\d{2}-\d{2}T([01]\d|2[0-3]):\d{2}:\d{2}([+-]\d{2}:\d{2}|Z)')
+
+# Bounded FIFO of (string, date) pairs that failed to parse, so retries of the same bad string are instant
+PARSE_FAIL_CACHE_SIZE = 512
+_PARSE_FAIL_CACHE: "OrderedDict[tuple, None]" = OrderedDict()
+_PARSE_FAIL_LOCK = threading.Lock()
+
+# Lowercases ASCII letters and maps "_" to " " in one pass; the relative keywords above are all ASCII
+_NORMALIZE_TABLE = str.maketrans({**{chr(c): chr(c + 32) for c in range(ord('A'), ord('Z') + 1)}, '_': ' '})
+
+def _is_midnight(dt: datetime) -> bool:
+    # Checks the fields directly instead of allocating a time via dt.time()
+    return not (dt.hour or dt.minute or dt.second or dt.microsecond)
 
 # Function for Date Parsing 
 def parse_datetime_for_api(datetime_str: str, default_time: Optional[time] = None, prefer_future: bool = True) -> Optional[str]:
@@ -23,66 +140,94 @@ def parse_datetime_for_api(datetime_str: str, default_time: Optional[time] = Non
     Handles common relative terms like "today", "tomorrow", "yesterday", "now" using a dynamic approach.
     If only a date is provided (or implied by a relative term), attaches a default_time (e.g., start/end of day).
     """
-    local_tz = gettz()
-    now_local = datetime.now(local_tz)
+    # Already API-ready: hand it back as-is once ciso8601 confirms it is a real date and time,
+    # unless it is a midnight that default_time would replace. Anything else takes the normal path.
+    if _FULL_ISO_RE.fullmatch(datetime_str) and not (default_time and datetime_str[11:19] == '00:00:00'):
+        try:
+            ciso8601.parse_datetime(datetime_str)
+        except ValueError:
+            pass
+        else:
+            return datetime_str[:-1] + '+00:00' if datetime_str.endswith('Z') else datetime_str
+
+    dt_obj = _parse_datetime_obj(datetime_str, default_time)
+    return dt_obj.isoformat() if dt_obj else None
+
+def _parse_datetime_obj(datetime_str: str, default_time: Optional[time] = None) -> Optional[datetime]:
+    """
+    Core of parse_datetime_for_api, returning the timezone-aware datetime itself so callers
+    that need to compare or offset it don't have to re-parse the ISO string.
+    """
+    now_local = datetime.now(_LOCAL_TZ)
     today_local_date = now_local.date()
 
-    def _combine_dt(date_part, time_part):
-        return datetime.combine(date_part, time_part, tzinfo=local_tz)
-
-    # Handlers for relative date strings
-    # Lambdas capture local_tz, now_local, today_local_date from the outer scope
-    relative_date_handlers = {
-        "now": lambda: now_local,
-        "today": lambda: _combine_dt(today_local_date, time.min),
-        "start of today": lambda: _combine_dt(today_local_date, time.min),
-        "beginning of today": lambda: _combine_dt(today_local_date, time.min),
-        "end of today": lambda: _combine_dt(today_local_date, time.max),
-        "tonight": lambda: _combine_dt(today_local_date, time.max), # Assumes 'tonight' means end of current day for API calls
-        "tomorrow": lambda: _combine_dt(today_local_date + timedelta(days=1), time.min),
-        "start of tomorrow": lambda: _combine_dt(today_local_date + timedelta(days=1), time.min),
-        "beginning of tomorrow": lambda: _combine_dt(today_local_date + timedelta(days=1), time.min),
-        "end of tomorrow": lambda: _combine_dt(today_local_date + timedelta(days=1), time.max),
-        "yesterday": lambda: _combine_dt(today_local_date - timedelta(days=1), time.min),
-        "start of yesterday": lambda: _combine_dt(today_local_date - timedelta(days=1), time.min),
-        "beginning of yesterday": lambda: _combine_dt(today_local_date - timedelta(days=1), time.min),
-        "end of yesterday": lambda: _combine_dt(today_local_date - timedelta(days=1), time.max),
-    }
-
-    normalized_datetime_str = datetime_str.lower().strip().replace("_", " ")
+    normalized_datetime_str = datetime_str.translate(_NORMALIZE_TABLE).strip()
     dt_obj: Optional[datetime] = None
 
-    handler = relative_date_handlers.get(normalized_datetime_str)
-    if handler:
-        dt_obj = handler()
+    entry = _RELATIVE_DATES.get(normalized_datetime_str)
+    if entry:
+        day_offset, time_part = entry
+        if day_offset is None:
+            dt_obj = now_local
+        else:
+            dt_obj = datetime.combine(today_local_date + timedelta(days=day_offset), time_part, tzinfo=_LOCAL_TZ)
     
     if dt_obj:
-        # If the handler resulted in a start-of-day (midnight) datetime,
+        # If the relative entry resolved to a start-of-day (midnight) datetime,
         # and a specific default_time is provided (e.g., time.max for end-of-day),
         # apply that default_time.
-        if dt_obj.time() == time.min and default_time:
+        if default_time and _is_midnight(dt_obj):
             dt_obj = datetime.combine(dt_obj.date(), default_time, tzinfo=dt_obj.tzinfo)
-        return dt_obj.isoformat()
+        return dt_obj
+
+    # Strings that already failed today fail again; skip re-running dateutil on them
+    fail_key = (datetime_str, today_local_date)
+    if fail_key in _PARSE_FAIL_CACHE:
+        return None
 
     # If not a recognized relative string, try parsing with dateutil.parser
     try:
-        dt_parsed = dateutil.parser.parse(datetime_str, tzinfos={"local": local_tz})
-
-        # Ensure timezone information is present
-        if dt_parsed.tzinfo is None or dt_parsed.tzinfo.utcoffset(dt_parsed) is None:
-            dt_parsed = dt_parsed.replace(tzinfo=local_tz)
-        
-        # If parsing resulted in a start-of-day (midnight) datetime (e.g. from "2023-10-10"),
-        # and a specific default_time is provided, apply it.
-        if dt_parsed.time() == time.min and default_time:
-            dt_parsed = datetime.combine(dt_parsed.date(), default_time, tzinfo=dt_parsed.tzinfo)
-
-        return dt_parsed.isoformat()
+        return _parse_absolute(datetime_str, default_time, today_local_date)
     except (ValueError, TypeError, OverflowError) as e:
         # It's useful to log the original string that failed parsing
-        print(f"Error parsing date string '{datetime_str}' with dateutil.parser: {e}")
+        logger.debug("Error parsing date string %r with dateutil.parser: %s", datetime_str, e)
+        with _PARSE_FAIL_LOCK:
+            _PARSE_FAIL_CACHE[fail_key] = None
+            if len(_PARSE_FAIL_CACHE) > PARSE_FAIL_CACHE_SIZE:
+                _PARSE_FAIL_CACHE.popitem(last=False)
         return None
 
+@functools.lru_cache(maxsize=4096)
+def _parse_absolute(datetime_str: str, default_time: Optional[time], today_local_date) -> datetime:
+    """
+    Cached dateutil branch of _parse_datetime_obj. The current date is part of the key because
+    dateutil fills in missing fields (e.g. "3pm", "Friday") relative to it. Failures raise and are not cached.
+    """
+    dt_parsed: Optional[datetime] = None
+    if _ISO_RE.fullmatch(datetime_str):
+        # Fast path: the LLM (and our own output) is almost always strict ISO 8601
+        try:
+            dt_parsed = ciso8601.parse_datetime(datetime_str)
+        except ValueError:
+            pass
+    if dt_parsed is None:
+        dt_parsed = _DATEUTIL_PARSER.parse(
+            datetime_str,
+            default=datetime.combine(today_local_date, time.min),
+            tzinfos=_TZINFOS,
+        )
+
+    # Ensure timezone information is present
+    if dt_parsed.tzinfo is None or dt_parsed.tzinfo.utcoffset(dt_parsed) is None:
+        dt_parsed = dt_parsed.replace(tzinfo=_LOCAL_TZ)
+    
+    # If parsing resulted in a start-of-day (midnight) datetime (e.g. from "2023-10-10"),
+    # and a specific default_time is provided, apply it.
+    if default_time and _is_midnight(dt_parsed):
+        dt_parsed = datetime.combine(dt_parsed.date(), default_time, tzinfo=dt_parsed.tzinfo)
+
+    return dt_parsed
+
 class CalendarEventInput(BaseModel):
     summary: str = Field(..., description="The title or summary of the event.")
     start_time_str: str = Field(..., description="The start date and time of the event (e.g., 'May 21st at 3pm', 'next Tuesday at 10 AM for 1 hour', '2025-12-25T09:00:00'). The agent should resolve this to a specific date and time based on the current date if relative.")
@@ -92,73 +237,147 @@ class CalendarEventInput(BaseModel):
     location: Optional[str] = Field(None, description="The location of the event.")
 
 
-def create_event(details: CalendarEventInput) -> str:
+def _build_insert(events, details: CalendarEventInput):
     """
-    Creates an event on the user's primary Google Calendar.
-    The agent should extract the event summary, a specific start date/time, and either a duration or a specific end date/time.
-    The current date is {current_date_for_llm_context}. Use this to resolve relative dates.
+    Validates the event details and returns the (unexecuted) insert request.
+    Returns an error message string instead if the details are invalid.
     """
-    service = create_service(GOOGLE_CLIENT_SECRET_PATH, CALENDAR_API_NAME, CALENDAR_API_VERSION, CALENDAR_SCOPES)
-    if not service:
-        return "Failed to connect to Google Calendar service. Please check authentication and client_secret.json."
-
-    start_iso = parse_datetime_for_api(details.start_time_str)
-    if not start_iso:
+    start_dt = _parse_datetime_obj(details.start_time_str)
+    if start_dt is None:
         return f"Could not understand the start time: '{details.start_time_str}'. Please provide a clearer date and time (e.g., 'June 5th 2025 at 2pm' or '2025-06-05T14:00:00')."
 
-    start_dt = dateutil.parser.isoparse(start_iso)
-
     if details.end_time_str:
-        end_iso = parse_datetime_for_api(details.end_time_str)
-        if not end_iso:
+        end_dt = _parse_datetime_obj(details.end_time_str)
+        if end_dt is None:
             return f"Could not understand the end time: '{details.end_time_str}'."
-        end_dt = dateutil.parser.isoparse(end_iso)
     elif details.duration_minutes:
         if details.duration_minutes <= 0:
             return "Event duration must be positive."
         end_dt = start_dt + timedelta(minutes=details.duration_minutes)
-        end_iso = end_dt.isoformat()
     else:
         end_dt = start_dt + timedelta(minutes=60) 
-        end_iso = end_dt.isoformat()
+
+    start_iso = start_dt.isoformat()
+    end_iso = end_dt.isoformat()
 
     if end_dt <= start_dt:
         return f"The event's end time ({end_iso}) must be after its start time ({start_iso})."
     
     event_body = {
         'summary': details.summary,
-        'location': details.location,
-        'description': details.description,
         'start': {'dateTime': start_iso},
         'end': {'dateTime': end_iso},
         'reminders': {'useDefault': True},
     }
+    # Only send optional fields that were given, rather than explicit nulls
+    if details.location:
+        event_body['location'] = details.location
+    if details.description:
+        event_body['description'] = details.description
+
+    return events.insert(calendarId='primary', body=event_body, fields='htmlLink,summary')
+
+def _build_patch(events, event_id: str, update_body: Dict[str, Any]):
+    return events.patch(calendarId='primary', eventId=event_id, body=update_body, sendUpdates='all', fields='htmlLink,summary')
+
+def _build_delete(events, event_id: str, send_notifications: bool):
+    send_updates_option = 'all' if send_notifications else 'none'
+    return events.delete(calendarId='primary', eventId=event_id, sendUpdates=send_updates_option)
+
+
+def create_event(details: CalendarEventInput) -> str:
+    """
+    Creates an event on the user's primary Google Calendar.
+    The agent should extract the event summary, a specific start date/time, and either a duration or a specific end date/time.
+    Resolve relative dates against the current date and time given in the system prompt.
+    """
+    service, events = _get_calendar_service()
+    if not service:
+        return "Failed to connect to Google Calendar service. Please check authentication and client_secret.json."
+
+    request = _build_insert(events, details)
+    if isinstance(request, str):
+        return request
 
     try:
-        created_event = service.events().insert(calendarId='primary', body=event_body).execute()
+        created_event = request.execute()
         event_url = created_event.get('htmlLink')
         return f"Event '{details.summary}' created successfully! View it here: {event_url}"
     except HttpError as error:
-        return f"Google Calendar API error while creating event: {error.resp.reason}. Details: {error.content.decode()}"
+        return _api_error_message(error, 'creating event')
+    except Exception as e:
+        return _api_error_message(e, 'creating event')
+
+
+class CreateEventsInput(BaseModel):
+    new_events: List[CalendarEventInput] = Field(..., description="One entry per event to create.")
+
+
+def create_events(details: CreateEventsInput) -> str:
+    """
+    Creates several events on the user's primary Google Calendar at once using a batched Google Calendar request.
+    Use this instead of calling 'create_event' repeatedly when the user wants to schedule more than one event.
+    Each event follows the same rules as 'create_event'. Returns one result line per event.
+    """
+    service, events = _get_calendar_service()
+    if not service:
+        return "Failed to connect to Google Calendar service. Please check authentication and client_secret.json."
+
+    results: List[Optional[str]] = [None] * len(details.new_events)
+    inserts = []
+    for i, event_details in enumerate(details.new_events):
+        request = _build_insert(events, event_details)
+        if isinstance(request, str):
+            results[i] = f"Event '{event_details.summary}': {request}"
+        else:
+            inserts.append((i, request))
+
+    try:
+        created = _execute_batch(service, [request for _, request in inserts])
+        for (i, _), (created_event, error) in zip(inserts, created):
+            summary = details.new_events[i].summary
+            if error is not None:
+                results[i] = f"Event '{summary}': {_api_error_message(error, 'creating event')}"
+            else:
+                results[i] = f"Event '{summary}' created successfully! View it here: {created_event.get('htmlLink')}"
+        return "\n".join(results)
+    except HttpError as error:
+        return _api_error_message(error, 'creating events')
     except Exception as e:
-        return f"An unexpected error occurred while creating event: {str(e)}"
+        return _api_error_message(e, 'creating events')
 
 # Tool for Listing/Finding Calendar Events 
+# Upper bound on events returned per list call; further results are fetched by page token
+LIST_MAX_RESULTS = 50
+
 class ListEventsInput(BaseModel):
     time_min_str: Optional[str] = Field(None, description="The start of the date/time range to search (e.g., 'today', 'tomorrow at 9am', '2025-06-01'). If only a date, assumes start of day. Defaults to now if not set.")
     time_max_str: Optional[str] = Field(None, description="The end of the date/time range to search (e.g., 'end of today', 'next Monday at 5pm', '2025-06-07'). If only a date, assumes end of day.")
     search_query: Optional[str] = Field(None, description="A text query to search within event summaries, descriptions, or locations (e.g., 'Project X meeting', 'dentist').")
-    max_results: int = Field(10, description="Maximum number of events to return. Default is 10, max is 250.")
+    max_results: int = Field(10, description="Maximum number of events to return. Default is 10, max is 50.")
+    page_token: Optional[str] = Field(None, description="The page token returned by a previous 'list_event' call with the same criteria, to fetch the next page of results.")
+
+
+# How list_event renders a timed event's start. ciso8601 attaches a fixed-offset tzinfo, so %Z
+# prints the offset (e.g. 'UTC+02:00'); dateutil's isoparse printed an empty string there
+_START_STRFTIME = '%Y-%m-%d %I:%M %p %Z'
+
+def _fmt_start(start: Dict[str, str]) -> str:
+    # All-day events carry a plain 'date' (YYYY-MM-DD) and need no parsing; timed events carry 'dateTime'
+    date_time = start.get('dateTime')
+    if date_time is None:
+        return f"{start.get('date')} (All-day)"
+    return ciso8601.parse_datetime(date_time).strftime(_START_STRFTIME)
 
 
 def list_event(details: ListEventsInput) -> str:
     """
     Lists calendar events based on a date range and/or a search query.
     Use this to find specific events (to get their IDs for updating or canceling) or to get an overview of the calendar.
-    The current date is {current_date_for_llm_context}. Use this to help resolve relative dates like 'today', 'next week'.
+    Resolve relative dates like 'today', 'next week' against the current date and time given in the system prompt.
     The function will return a list of events with their summaries, start times, and IDs.
     """
-    service = create_service(GOOGLE_CLIENT_SECRET_PATH, CALENDAR_API_NAME, CALENDAR_API_VERSION, CALENDAR_SCOPES)
+    service, events = _get_calendar_service()
     if not service:
         return "Failed to connect to Google Calendar service."
 
@@ -166,7 +385,7 @@ def list_event(details: ListEventsInput) -> str:
     if details.time_min_str:
         time_min_iso = parse_datetime_for_api(details.time_min_str, default_time=time.min) 
     else:
-        time_min_iso = datetime.now(gettz()).isoformat()
+        time_min_iso = datetime.now(_LOCAL_TZ).isoformat()
 
 
     time_max_iso = None
@@ -177,38 +396,36 @@ def list_event(details: ListEventsInput) -> str:
         return "Could not parse time_min_str. Please provide a valid start date/time."
 
     try:
-        events_result = service.events().list(
+        events_result = events.list(
             calendarId='primary',
             timeMin=time_min_iso,
             timeMax=time_max_iso,
             q=details.search_query,
-            maxResults=min(details.max_results, 250), 
+            maxResults=min(details.max_results, LIST_MAX_RESULTS),
+            pageToken=details.page_token,
             singleEvents=True,
-            orderBy='startTime'
+            orderBy='startTime',
+            # Partial response: only the fields formatted below
+            fields='nextPageToken,items(id,summary,start(date,dateTime))',
         ).execute()
         
         items = events_result.get('items', [])
         if not items:
             return "No events found matching your criteria."
 
-        event_list_str = "Found events:\n"
-        for item in items:
-            start = item['start'].get('dateTime', item['start'].get('date')) 
-            try:
-                start_dt = dateutil.parser.isoparse(start)
-                formatted_start = start_dt.strftime('%Y-%m-%d %I:%M %p %Z') if start_dt.time() != time.min else start_dt.strftime('%Y-%m-%d (All-day)')
-            except:
-                formatted_start = start
-            event_list_str += f"- '{item.get('summary', 'No Title')}' on {formatted_start} (ID: {item['id']})\n"
+        lines = ["Found events:"]
+        lines.extend(f"- '{item.get('summary', 'No Title')}' on {_fmt_start(item['start'])} (ID: {item['id']})" for item in items)
+        event_list_str = "\n".join(lines)
         
-        if events_result.get('nextPageToken'):
-            event_list_str += "\nNote: There may be more events than shown. You can refine your search or increase max_results."
+        next_page_token = events_result.get('nextPageToken')
+        if next_page_token:
+            event_list_str += f"\n\nNote: There are more events than shown. To see them, call again with the same criteria and page_token='{next_page_token}', or refine your search."
             
-        return event_list_str.strip()
+        return event_list_str
     except HttpError as error:
-        return f"Google Calendar API error while listing events: {error.resp.reason}. Details: {error.content.decode()}"
+        return _api_error_message(error, 'listing events')
     except Exception as e:
-        return f"An unexpected error occurred while listing events: {str(e)}"
+        return _api_error_message(e, 'listing events')
 
 # Tool for Updating/Editing/Rescheduling Calendar Events
 class UpdateEventInput(BaseModel):
@@ -221,92 +438,163 @@ class UpdateEventInput(BaseModel):
     new_location: Optional[str] = Field(None, description="The new location. Provide an empty string ('') to clear. If None, location is unchanged.")
 
 
+def _needs_current_times(details: UpdateEventInput) -> bool:
+    # The current start/end are only needed to keep the original duration (new start only)
+    # or to anchor a new end/duration to the existing start (no new start)
+    return bool(details.new_start_time_str) != bool(details.new_end_time_str or details.new_duration_minutes)
+
+def _build_update_body(details: UpdateEventInput, event_to_update: Optional[Dict[str, Any]]) -> Dict[str, Any] | str:
+    """
+    Builds the PATCH body for an update against the event's current state.
+    event_to_update may be None when _needs_current_times(details) is False.
+    Returns an error message string instead if the requested change is invalid.
+    """
+    update_body: Dict[str, Any] = {}
+
+    if details.new_summary is not None:
+        update_body['summary'] = details.new_summary
+    if details.new_description is not None:
+        update_body['description'] = details.new_description
+    if details.new_location is not None:
+        update_body['location'] = details.new_location
+
+    if event_to_update is not None:
+        current_start, current_end = event_to_update['start'], event_to_update['end']
+        current_start_dt = ciso8601.parse_datetime(current_start.get('dateTime') or current_start.get('date'))
+        current_end_dt = ciso8601.parse_datetime(current_end.get('dateTime') or current_end.get('date'))
+    
+    new_start_iso: Optional[str] = None
+    new_end_iso: Optional[str] = None
+
+    if details.new_start_time_str:
+        new_start_dt = _parse_datetime_obj(details.new_start_time_str)
+        if new_start_dt is None:
+            return f"Could not parse new_start_time_str: '{details.new_start_time_str}'"
+        new_start_iso = new_start_dt.isoformat()
+        update_body['start'] = {'dateTime': new_start_iso}
+        
+        if details.new_end_time_str:
+            new_end_dt = _parse_datetime_obj(details.new_end_time_str)
+            if new_end_dt is None:
+                return f"Could not parse new_end_time_str: '{details.new_end_time_str}'"
+            new_end_iso = new_end_dt.isoformat()
+        elif details.new_duration_minutes:
+            if details.new_duration_minutes <= 0: return "New duration must be positive."
+            new_end_dt = new_start_dt + timedelta(minutes=details.new_duration_minutes)
+            new_end_iso = new_end_dt.isoformat()
+        else: 
+            original_duration = current_end_dt - current_start_dt
+            new_end_dt = new_start_dt + original_duration
+            new_end_iso = new_end_dt.isoformat()
+        
+        update_body['end'] = {'dateTime': new_end_iso}
+        
+        if new_end_dt <= new_start_dt:
+             return f"The event's new end time ({new_end_iso}) must be after its new start time ({new_start_iso})."
+
+    elif details.new_end_time_str or details.new_duration_minutes:
+        new_start_dt_for_calc = current_start_dt
+        update_body['start'] = {'dateTime': new_start_dt_for_calc.isoformat()} 
+
+        if details.new_end_time_str:
+            new_end_dt = _parse_datetime_obj(details.new_end_time_str)
+            if new_end_dt is None:
+                return f"Could not parse new_end_time_str: '{details.new_end_time_str}'"
+            new_end_iso = new_end_dt.isoformat()
+        elif details.new_duration_minutes: 
+             if details.new_duration_minutes <= 0: return "New duration must be positive."
+             new_end_dt = new_start_dt_for_calc + timedelta(minutes=details.new_duration_minutes)
+             new_end_iso = new_end_dt.isoformat()
+        
+        if new_end_iso:
+             update_body['end'] = {'dateTime': new_end_iso}
+             if new_end_dt <= new_start_dt_for_calc:
+                 return f"The event's new end time ({new_end_iso}) must be after its start time ({new_start_dt_for_calc.isoformat()})."
+
+
+    if not update_body:
+        return "No changes specified for the event. Please provide fields to update."
+
+    return update_body
+
+
 def change_event(details: UpdateEventInput) -> str:
     """
     Updates an existing calendar event identified by its event_id.
     You MUST provide the event_id. Use 'list_calendar_events' to find the event ID if needed.
     Only fields explicitly provided in the input (e.g., new_summary, new_start_time_str) will be changed.
     To reschedule, provide new_start_time_str and either new_end_time_str or new_duration_minutes.
-    The current date is {current_date_for_llm_context}.
     """
-    service = create_service(GOOGLE_CLIENT_SECRET_PATH, CALENDAR_API_NAME, CALENDAR_API_VERSION, CALENDAR_SCOPES)
+    service, events = _get_calendar_service()
     if not service:
         return "Failed to connect to Google Calendar service."
 
     try:
-        event_to_update = service.events().get(calendarId='primary', eventId=details.event_id).execute()
-        if not event_to_update:
-            return f"Event with ID '{details.event_id}' not found."
+        event_to_update = None
+        if _needs_current_times(details):
+            event_to_update = events.get(calendarId='primary', eventId=details.event_id, fields='start,end').execute()
+            if not event_to_update:
+                return f"Event with ID '{details.event_id}' not found."
         
-        update_body: Dict[str, Any] = {}
+        update_body = _build_update_body(details, event_to_update)
+        if isinstance(update_body, str):
+            return update_body
 
-        if details.new_summary is not None:
-            update_body['summary'] = details.new_summary
-        if details.new_description is not None:
-            update_body['description'] = details.new_description
-        if details.new_location is not None:
-            update_body['location'] = details.new_location
+        updated_event = _build_patch(events, details.event_id, update_body).execute()
+        return f"Event '{updated_event.get('summary')}' updated successfully. View it here: {updated_event.get('htmlLink')}"
 
-        current_start_dt = dateutil.parser.isoparse(event_to_update['start'].get('dateTime', event_to_update['start'].get('date')))
-        current_end_dt = dateutil.parser.isoparse(event_to_update['end'].get('dateTime', event_to_update['end'].get('date')))
-        
-        new_start_iso: Optional[str] = None
-        new_end_iso: Optional[str] = None
-
-        if details.new_start_time_str:
-            new_start_iso = parse_datetime_for_api(details.new_start_time_str)
-            if not new_start_iso:
-                return f"Could not parse new_start_time_str: '{details.new_start_time_str}'"
-            update_body['start'] = {'dateTime': new_start_iso}
-            
-            new_start_dt = dateutil.parser.isoparse(new_start_iso)
-            if details.new_end_time_str:
-                new_end_iso = parse_datetime_for_api(details.new_end_time_str)
-                if not new_end_iso:
-                    return f"Could not parse new_end_time_str: '{details.new_end_time_str}'"
-            elif details.new_duration_minutes:
-                if details.new_duration_minutes <= 0: return "New duration must be positive."
-                new_end_dt = new_start_dt + timedelta(minutes=details.new_duration_minutes)
-                new_end_iso = new_end_dt.isoformat()
-            else: 
-                original_duration = current_end_dt - current_start_dt
-                new_end_dt = new_start_dt + original_duration
-                new_end_iso = new_end_dt.isoformat()
-            
-            update_body['end'] = {'dateTime': new_end_iso}
-            
-            if dateutil.parser.isoparse(new_end_iso) <= new_start_dt:
-                 return f"The event's new end time ({new_end_iso}) must be after its new start time ({new_start_iso})."
-
-        elif details.new_end_time_str or details.new_duration_minutes:
-            new_start_dt_for_calc = current_start_dt
-            update_body['start'] = {'dateTime': new_start_dt_for_calc.isoformat()} 
-
-            if details.new_end_time_str:
-                new_end_iso = parse_datetime_for_api(details.new_end_time_str)
-                if not new_end_iso:
-                    return f"Could not parse new_end_time_str: '{details.new_end_time_str}'"
-            elif details.new_duration_minutes: 
-                 if details.new_duration_minutes <= 0: return "New duration must be positive."
-                 new_end_dt = new_start_dt_for_calc + timedelta(minutes=details.new_duration_minutes)
-                 new_end_iso = new_end_dt.isoformat()
-            
-            if new_end_iso:
-                 update_body['end'] = {'dateTime': new_end_iso}
-                 if dateutil.parser.isoparse(new_end_iso) <= new_start_dt_for_calc:
-                     return f"The event's new end time ({new_end_iso}) must be after its start time ({new_start_dt_for_calc.isoformat()})."
+    except HttpError as error:
+        return _api_error_message(error, 'updating event')
+    except Exception as e:
+        return _api_error_message(e, 'updating event')
 
 
-        if not update_body:
-            return "No changes specified for the event. Please provide fields to update."
+class UpdateEventsInput(BaseModel):
+    updates: List[UpdateEventInput] = Field(..., description="One entry per event to update, each with its own event_id and changes.")
 
-        updated_event = service.events().patch(calendarId='primary', eventId=details.event_id, body=update_body, sendUpdates='all').execute()
-        return f"Event '{updated_event.get('summary')}' updated successfully. View it here: {updated_event.get('htmlLink')}"
 
+def change_events(details: UpdateEventsInput) -> str:
+    """
+    Updates several existing calendar events at once using batched Google Calendar requests.
+    Use this instead of calling 'change_event' repeatedly when the user wants to change more than one event.
+    Each update follows the same rules as 'change_event'. Returns one result line per event.
+    """
+    service, events = _get_calendar_service()
+    if not service:
+        return "Failed to connect to Google Calendar service."
+
+    try:
+        # Only fetch the events whose new timing depends on their current start/end
+        needs_get = [i for i, update in enumerate(details.updates) if _needs_current_times(update)]
+        fetched = _execute_batch(service, [events.get(calendarId='primary', eventId=details.updates[i].event_id, fields='start,end') for i in needs_get])
+        current_events: List[tuple] = [(None, None)] * len(details.updates)
+        for i, fetched_event in zip(needs_get, fetched):
+            current_events[i] = fetched_event
+
+        results: List[Optional[str]] = [None] * len(details.updates)
+        patches = []
+        for i, (update, (event_to_update, error)) in enumerate(zip(details.updates, current_events)):
+            if error is not None:
+                results[i] = f"Event '{update.event_id}': {_api_error_message(error, 'updating event')}"
+                continue
+            update_body = _build_update_body(update, event_to_update)
+            if isinstance(update_body, str):
+                results[i] = f"Event '{update.event_id}': {update_body}"
+                continue
+            patches.append((i, _build_patch(events, update.event_id, update_body)))
+
+        patched = _execute_batch(service, [request for _, request in patches])
+        for (i, _), (updated_event, error) in zip(patches, patched):
+            if error is not None:
+                results[i] = f"Event '{details.updates[i].event_id}': {_api_error_message(error, 'updating event')}"
+            else:
+                results[i] = f"Event '{updated_event.get('summary')}' updated successfully. View it here: {updated_event.get('htmlLink')}"
+
+        return "\n".join(results)
     except HttpError as error:
-        return f"Google Calendar API error while updating event: {error.resp.reason}. Details: {error.content.decode()}"
+        return _api_error_message(error, 'updating events')
     except Exception as e:
-        return f"An unexpected error occurred while updating event: {str(e)}"
+        return _api_error_message(e, 'updating events')
 
 
 class CancelEventInput(BaseModel):
@@ -318,28 +606,56 @@ def cancel_event(details: CancelEventInput) -> str:
     """
     Cancels (deletes) an existing calendar event identified by its event_id.
     You MUST provide the event_id. If the user refers to an event vaguely (e.g., "cancel my meeting tomorrow afternoon"), first use 'list_calendar_events' to find the specific event and confirm its ID.
-    The current date is {current_date_for_llm_context}.
     """
-    service = create_service(GOOGLE_CLIENT_SECRET_PATH, CALENDAR_API_NAME, CALENDAR_API_VERSION, CALENDAR_SCOPES)
+    service, events = _get_calendar_service()
     if not service:
         return "Failed to connect to Google Calendar service."
 
     try:
         # Check if event exists before trying to delete (optional, delete will fail if not found anyway)
-        # service.events().get(calendarId='primary', eventId=details.event_id).execute()
+        # events.get(calendarId='primary', eventId=details.event_id).execute()
         
-        send_updates_option = 'all' if details.send_notifications else 'none'
-        service.events().delete(calendarId='primary', eventId=details.event_id, sendUpdates=send_updates_option).execute()
+        _build_delete(events, details.event_id, details.send_notifications).execute()
         return f"Event with ID '{details.event_id}' cancelled successfully."
     except HttpError as error:
         if error.resp.status == 404:
             return f"Event with ID '{details.event_id}' not found. Cannot cancel."
-        return f"Google Calendar API error while canceling event: {error.resp.reason}. Details: {error.content.decode()}"
+        return _api_error_message(error, 'canceling event')
     except Exception as e:
-        return f"An unexpected error occurred while canceling event: {str(e)}"
+        return _api_error_message(e, 'canceling event')
+
+
+class CancelEventsInput(BaseModel):
+    event_ids: List[str] = Field(..., description="The unique IDs of the events to cancel. Obtain these IDs using 'list_event'.")
+    send_notifications: bool = Field(True, description="Whether to send notifications to attendees about the cancellations. Defaults to True (sendUpdates='all').")
 
-_current_date_str = datetime.now(gettz()).strftime("%Y-%m-%d, %A, %I:%M %p %Z")
-create_event.__doc__ = (create_event.__doc__ or "").format(current_date_for_llm_context=_current_date_str)
-list_event.__doc__ = (list_event.__doc__ or "").format(current_date_for_llm_context=_current_date_str)
-change_event.__doc__ = (change_event.__doc__ or "").format(current_date_for_llm_context=_current_date_str)
-cancel_event.__doc__ = (cancel_event.__doc__ or "").format(current_date_for_llm_context=_current_date_str)
\ No newline at end of file
+
+def cancel_events(details: CancelEventsInput) -> str:
+    """
+    Cancels (deletes) several calendar events at once using a batched Google Calendar request.
+    Use this instead of calling 'cancel_event' repeatedly when the user wants to cancel more than one event.
+    Returns one result line per event.
+    """
+    service, events = _get_calendar_service()
+    if not service:
+        return "Failed to connect to Google Calendar service."
+
+    try:
+        deleted = _execute_batch(service, [
+            _build_delete(events, event_id, details.send_notifications)
+            for event_id in details.event_ids
+        ])
+
+        results = []
+        for event_id, (_, error) in zip(details.event_ids, deleted):
+            if error is None:
+                results.append(f"Event with ID '{event_id}' cancelled successfully.")
+            elif isinstance(error, HttpError) and error.resp.status == 404:
+                results.append(f"Event with ID '{event_id}' not found. Cannot cancel.")
+            else:
+                results.append(f"Event '{event_id}': {_api_error_message(error, 'canceling event')}")
+        return "\n".join(results)
+    except HttpError as error:
+        return _api_error_message(error, 'canceling events')
+    except Exception as e:
+        return _api_error_message(e, 'canceling events')